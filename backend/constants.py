@@ -1,2 +1,3 @@
 VALID_COMPANIES = ["JET", "JADLOG", "MERCADO_LIVRE"]
-VALID_STATUSES = ["pending", "approved", "rejected"]
\ No newline at end of file
+VALID_STATUSES = ["pending", "approved", "rejected"]
+UPLOAD_DIR = "uploads"
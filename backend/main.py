@@ -1,330 +1,90 @@
 import os
-from datetime import datetime, timedelta
-from typing import Optional, List
+import time
+import logging
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+# Marca o início do boot (antes dos imports pesados) pra medir o tempo até o worker ficar pronto
+_BOOT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import func, case
-from sqlalchemy.orm import Session
-
-from db import engine, Base, get_db
-from models import User, Delivery
-from schemas import (
-    LoginRequest, LoginResponse,
-    DeliveryCreateResponse, DeliveryItem,
-    ApproveRequest, CreateCourierRequest, UserPublic,
-    UpdateCourierCompaniesRequest
-)
-from auth import (
-    verify_password,
-    create_access_token,
-    get_current_user,
-    require_admin,
-    hash_password,
-)
-
-Base.metadata.create_all(bind=engine)
-
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-app = FastAPI(title="Entregas API", version="1.0.0")
-
-@app.get("/teste-vida")
-def teste_vida():
-    return {"status": "Estou vivo e atualizado!"}
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],   # ok pra dev
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
-
-
-@app.get("/health")
-def health():
-    return {"ok": True}
 
+from db import engine, Base
+from constants import UPLOAD_DIR
+from search import init_search_index
+from routes import auth, couriers, deliveries, stats
 
-@app.post("/auth/login", response_model=LoginResponse)
-def login(body: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == body.username).first()
-    if not user or not verify_password(body.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Usuário ou senha inválidos")
+logger = logging.getLogger("uvicorn.error")
 
-    token = create_access_token(user_id=user.id, role=user.role)
-    companies = user.companies or [] if user.role == "courier" else []
-    return LoginResponse(
-        access_token=token,
-        role=user.role,
-        name=user.name,
-        companies=companies
-    )
-
-
-# ✅ ADMIN: listar entregadores (pra você escolher / ver quem existe)
-@app.get("/users/couriers", response_model=List[UserPublic])
-def list_couriers(
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin),
-):
-    couriers = db.query(User).filter(User.role == "courier").order_by(User.name.asc()).all()
-    return couriers
-
-
-# ✅ ADMIN: atualizar empresas do entregador
-@app.patch("/users/couriers/{courier_id}/companies", response_model=UserPublic)
-def update_courier_companies(
-    courier_id: int,
-    body: UpdateCourierCompaniesRequest,
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin),
-):
-    courier = db.query(User).filter(User.id == courier_id, User.role == "courier").first()
-    if not courier:
-        raise HTTPException(status_code=404, detail="Entregador não encontrado")
-    
-    # Validar empresas
-    valid_companies = ["jet", "jadlog", "mercado_livre"]
-    companies = [c.lower().strip() for c in body.companies]
-    companies = [c for c in companies if c in valid_companies]
-    
-    if not companies:
-        raise HTTPException(status_code=400, detail="Selecione pelo menos uma empresa")
-    
-    courier.companies = companies
-    db.commit()
-    db.refresh(courier)
-    return courier
+# Orçamento de tempo de startup (ms). Acima disso loga um warning.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
 
+# Em produção (com várias réplicas/workers) rode `python main.py --init-db` uma vez no deploy
+# e suba os workers com DB_INIT_ON_STARTUP=0 pra não repetir o create_all em cada worker.
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "1") == "1"
 
-# ✅ ADMIN: criar entregador
-@app.post("/users/couriers", response_model=UserPublic)
-def create_courier(
-    body: CreateCourierRequest,
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin),
-):
-    username = body.username.strip()
-    name = body.name.strip()
-
-    if len(username) < 3:
-        raise HTTPException(status_code=400, detail="username muito curto")
-    if len(body.password) < 6:
-        raise HTTPException(status_code=400, detail="senha deve ter pelo menos 6 caracteres")
-
-    exists = db.query(User).filter(User.username == username).first()
-    if exists:
-        raise HTTPException(status_code=409, detail="username já existe")
-
-    # Validar empresas
-    valid_companies = ["jet", "jadlog", "mercado_livre"]
-    companies = [c.lower().strip() for c in body.companies]
-    companies = [c for c in companies if c in valid_companies]
-    
-    if not companies:
-        raise HTTPException(status_code=400, detail="Selecione pelo menos uma empresa")
-
-    user = User(
-        name=name,
-        username=username,
-        password_hash=hash_password(body.password),
-        role="courier",
-        companies=companies,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
 
+def init_db():
+    """Cria as tabelas que faltarem, o índice de busca e a pasta de uploads"""
+    Base.metadata.create_all(bind=engine)
+    init_search_index(engine)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@app.post("/deliveries", response_model=DeliveryCreateResponse)
-def create_delivery(
-    photo: UploadFile = File(...),
-    company: str = Form(...),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-):
-    # Validar empresa
-    valid_companies = ["jet", "jadlog", "mercado_livre"]
-    company_lower = company.lower().strip()
-    if company_lower not in valid_companies:
-        raise HTTPException(status_code=400, detail="Empresa inválida")
-    
-    # Verificar se entregador trabalha com essa empresa
-    if user.role == "courier":
-        user_companies = user.companies or []
-        if company_lower not in user_companies:
-            raise HTTPException(status_code=403, detail="Você não trabalha com esta empresa")
 
-    ext = os.path.splitext(photo.filename)[1].lower()
-    if ext not in [".jpg", ".jpeg", ".png", ".webp"]:
-        raise HTTPException(status_code=400, detail="Formato inválido. Use jpg, png ou webp.")
-
-    filename = f"{user.id}_{int(datetime.utcnow().timestamp())}{ext}"
-    filepath = os.path.join(UPLOAD_DIR, filename)
-
-    with open(filepath, "wb") as f:
-        f.write(photo.file.read())
-
-    photo_url = f"/uploads/{filename}"
-
-    delivery = Delivery(
-        user_id=user.id,
-        created_at=datetime.utcnow(),
-        photo_url=photo_url,
-        company=company_lower,
-        status="pending",
-        notes=None,
-    )
-    db.add(delivery)
-    db.commit()
-    db.refresh(delivery)
-    return delivery
-
-
-@app.get("/deliveries", response_model=List[DeliveryItem])
-def list_deliveries(
-    from_date: Optional[str] = None,   # "YYYY-MM-DD"
-    to_date: Optional[str] = None,     # "YYYY-MM-DD"
-    courier_id: Optional[int] = None,  # admin pode filtrar por entregador
-    company: Optional[str] = None,     # filtrar por empresa: "jet", "jadlog", "mercado_livre"
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-):
-    q = db.query(Delivery).join(User)
-
-    if user.role != "admin":
-        q = q.filter(Delivery.user_id == user.id)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_INIT_ON_STARTUP:
+        init_db()
     else:
-        if courier_id is not None:
-            q = q.filter(Delivery.user_id == courier_id)
-
-    # Filtro por empresa
-    if company:
-        company_lower = company.lower().strip()
-        valid_companies = ["jet", "jadlog", "mercado_livre"]
-        if company_lower in valid_companies:
-            q = q.filter(Delivery.company == company_lower)
-
-    def parse_date(d: str) -> datetime:
-        return datetime.strptime(d, "%Y-%m-%d")
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-    if from_date:
-        q = q.filter(Delivery.created_at >= parse_date(from_date))
-    if to_date:
-        q = q.filter(Delivery.created_at < parse_date(to_date) + timedelta(days=1))
-
-    q = q.order_by(Delivery.created_at.desc())
-    deliveries = q.all()
-
-    for d in deliveries:
-        _ = d.user
-
-    return deliveries
-
-
-@app.patch("/deliveries/{delivery_id}/status", response_model=DeliveryCreateResponse)
-def set_delivery_status(
-    delivery_id: int,
-    body: ApproveRequest,
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin),
-):
-    if body.status not in ["approved", "rejected"]:
-        raise HTTPException(status_code=400, detail="status deve ser approved ou rejected")
-
-    delivery = db.query(Delivery).filter(Delivery.id == delivery_id).first()
-    if not delivery:
-        raise HTTPException(status_code=404, detail="Entrega não encontrada")
-
-    delivery.status = body.status
-    delivery.notes = body.notes
-    db.commit()
-    db.refresh(delivery)
-    return delivery
+    startup_ms = (time.perf_counter() - _BOOT_STARTED) * 1000
+    app.state.startup_ms = round(startup_ms, 1)
+    if startup_ms > STARTUP_BUDGET_MS:
+        logger.warning("Startup levou %.0f ms (orçamento: %.0f ms)", startup_ms, STARTUP_BUDGET_MS)
+    else:
+        logger.info("Startup em %.0f ms (orçamento: %.0f ms)", startup_ms, STARTUP_BUDGET_MS)
 
+    yield
 
-@app.get("/stats/fortnight")
-def stats_fortnight(
-    start: str,  # "YYYY-MM-DD"
-    company: Optional[str] = None,  # filtrar por empresa
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-):
-    start_dt = datetime.strptime(start, "%Y-%m-%d")
-    end_dt = start_dt + timedelta(days=14, hours=23, minutes=59, seconds=59)
+    engine.dispose()
 
-    q = db.query(Delivery).filter(Delivery.created_at >= start_dt, Delivery.created_at <= end_dt)
 
-    if user.role != "admin":
-        q = q.filter(Delivery.user_id == user.id)
-    
-    # Filtro por empresa
-    if company:
-        company_lower = company.lower().strip()
-        valid_companies = ["jet", "jadlog", "mercado_livre"]
-        if company_lower in valid_companies:
-            q = q.filter(Delivery.company == company_lower)
+def create_app() -> FastAPI:
+    app = FastAPI(title="Entregas API", version="1.0.0", lifespan=lifespan)
 
-    deliveries = q.all()
-    total = len(deliveries)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],   # ok pra dev
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-    by_day = {}
-    for d in deliveries:
-        key = d.created_at.strftime("%Y-%m-%d")
-        by_day[key] = by_day.get(key, 0) + 1
+    # check_dir=False: a pasta é criada no lifespan, não no import
+    app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
-    return {"start": start, "end": end_dt.strftime("%Y-%m-%d"), "total": total, "by_day": by_day}
+    @app.get("/teste-vida")
+    def teste_vida():
+        return {"status": "Estou vivo e atualizado!"}
 
-@app.get("/admin/stats")
-def admin_stats(
-    db: Session = Depends(get_db),
-    admin: User = Depends(require_admin),
-):
-    # 1. Total de Entregadores
-    total_couriers = db.query(User).filter(User.role == "courier").count()
+    @app.get("/health")
+    def health():
+        return {"ok": True, "startup_ms": getattr(app.state, "startup_ms", None)}
 
-    # 2. Entregas Pendentes (Geral)
-    total_pending = db.query(Delivery).filter(Delivery.status == "pending").count()
+    for router in (auth.router, couriers.router, deliveries.router, stats.router):
+        app.include_router(router)
 
-    # 3. Entregas Hoje (Geral)
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    total_today = db.query(Delivery).filter(Delivery.created_at >= today_start).count()
+    return app
 
-    # 4. Gráfico: Últimos 7 dias
-    # Vamos gerar os dados agrupados por dia
-    seven_days_ago = today_start - timedelta(days=6)
-    
-    # Query agrupada por data
-    # SQLite/Postgres tem sintaxes diferentes para data, mas vamos fazer python-side para compatibilidade simples
-    # (Se tiver muitos dados, fazer group_by no SQL é melhor, mas para < 10k registros isso é instantâneo)
-    recent_deliveries = db.query(Delivery.created_at).filter(Delivery.created_at >= seven_days_ago).all()
 
-    # Inicializa o mapa com 0 para os últimos 7 dias
-    stats_map = {}
-    for i in range(7):
-        d = seven_days_ago + timedelta(days=i)
-        key = d.strftime("%Y-%m-%d")
-        stats_map[key] = 0
+app = create_app()
 
-    # Preenche com os dados reais
-    for d in recent_deliveries:
-        key = d.created_at.strftime("%Y-%m-%d")
-        if key in stats_map:
-            stats_map[key] += 1
 
-    # Formata para lista ordenada
-    chart_data = [{"date": k, "count": v} for k, v in stats_map.items()]
+if __name__ == "__main__":
+    import sys
 
-    return {
-        "total_couriers": total_couriers,
-        "total_pending": total_pending,
-        "total_today": total_today,
-        "weekly_chart": chart_data
-    }
\ No newline at end of file
+    if "--init-db" in sys.argv:
+        init_db()
+        print("Banco inicializado.")
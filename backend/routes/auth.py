@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from db import get_db
+from models import User
+from schemas import LoginRequest, LoginResponse
+from auth import verify_password, create_access_token
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/login", response_model=LoginResponse)
+def login(body: LoginRequest, db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.username == body.username).first()
+    if not user or not verify_password(body.password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Usuário ou senha inválidos")
+
+    token = create_access_token(user_id=user.id, role=user.role)
+    companies = user.companies or [] if user.role == "courier" else []
+    return LoginResponse(
+        access_token=token,
+        role=user.role,
+        name=user.name,
+        companies=companies
+    )
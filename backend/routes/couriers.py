@@ -1,63 +1,87 @@
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+
+from db import get_db
 from models import User
-from schemas import CourierCreate, CompaniesUpdate
+from schemas import CreateCourierRequest, UserPublic, UpdateCourierCompaniesRequest
 from auth import require_admin, hash_password
-from database import get_db
-from constants import VALID_COMPANIES
 
-router = APIRouter(prefix="/couriers", tags=["Couriers"])
+router = APIRouter(prefix="/users/couriers", tags=["Couriers"])
 
-@router.post("")
-def create_courier(
-    payload: CourierCreate,
+
+# ✅ ADMIN: listar entregadores (pra você escolher / ver quem existe)
+@router.get("", response_model=List[UserPublic])
+def list_couriers(
     db: Session = Depends(get_db),
-    admin=Depends(require_admin),
+    admin: User = Depends(require_admin),
 ):
-    companies = [c.upper() for c in payload.companies]
+    couriers = db.query(User).filter(User.role == "courier").order_by(User.name.asc()).all()
+    return couriers
 
-    if any(c not in VALID_COMPANIES for c in companies):
-        raise HTTPException(400, "Empresa inválida")
 
-    courier = User(
-        name=payload.name,
-        username=payload.username,
-        role="courier",
-        password_hash=hash_password(payload.password),
-    )
-    courier.set_companies(companies)
-
-    db.add(courier)
+# ✅ ADMIN: atualizar empresas do entregador
+@router.patch("/{courier_id}/companies", response_model=UserPublic)
+def update_courier_companies(
+    courier_id: int,
+    body: UpdateCourierCompaniesRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    courier = db.query(User).filter(User.id == courier_id, User.role == "courier").first()
+    if not courier:
+        raise HTTPException(status_code=404, detail="Entregador não encontrado")
+    
+    # Validar empresas
+    valid_companies = ["jet", "jadlog", "mercado_livre"]
+    companies = [c.lower().strip() for c in body.companies]
+    companies = [c for c in companies if c in valid_companies]
+    
+    if not companies:
+        raise HTTPException(status_code=400, detail="Selecione pelo menos uma empresa")
+    
+    courier.companies = companies
     db.commit()
     db.refresh(courier)
-
-    return {
-        "id": courier.id,
-        "name": courier.name,
-        "username": courier.username,
-        "companies": courier.get_companies(),
-    }
+    return courier
 
 
-@router.put("/{courier_id}/companies")
-def update_companies(
-    courier_id: int,
-    payload: CompaniesUpdate,
+# ✅ ADMIN: criar entregador
+@router.post("", response_model=UserPublic)
+def create_courier(
+    body: CreateCourierRequest,
     db: Session = Depends(get_db),
-    admin=Depends(require_admin),
+    admin: User = Depends(require_admin),
 ):
-    courier = db.query(User).filter(
-        User.id == courier_id,
-        User.role == "courier"
-    ).first()
+    username = body.username.strip()
+    name = body.name.strip()
 
-    if not courier:
-        raise HTTPException(404, "Entregador não encontrado")
+    if len(username) < 3:
+        raise HTTPException(status_code=400, detail="username muito curto")
+    if len(body.password) < 6:
+        raise HTTPException(status_code=400, detail="senha deve ter pelo menos 6 caracteres")
+
+    exists = db.query(User).filter(User.username == username).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="username já existe")
 
-    companies = [c.upper() for c in payload.companies]
-    if any(c not in VALID_COMPANIES for c in companies):
-        raise HTTPException(400, "Empresa inválida")
+    # Validar empresas
+    valid_companies = ["jet", "jadlog", "mercado_livre"]
+    companies = [c.lower().strip() for c in body.companies]
+    companies = [c for c in companies if c in valid_companies]
+    
+    if not companies:
+        raise HTTPException(status_code=400, detail="Selecione pelo menos uma empresa")
 
-    courier.set_companies(companies)
+    user = User(
+        name=name,
+        username=username,
+        password_hash=hash_password(body.password),
+        role="courier",
+        companies=companies,
+    )
+    db.add(user)
     db.commit()
-    return {"ok": True}
\ No newline at end of file
+    db.refresh(user)
+    return user
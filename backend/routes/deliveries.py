@@ -1,44 +1,175 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from sqlalchemy.orm import Session
-from models import Delivery, User
-from database import get_db
-from auth import require_courier
-from constants import VALID_COMPANIES
-import uuid, os
+import os
+from datetime import datetime, timedelta
+from typing import Optional, List
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from sqlalchemy.orm import Session, joinedload
+
+from db import get_db
+from models import User, Delivery
+from schemas import DeliveryCreateResponse, DeliveryItem, DeliverySearchResponse, ApproveRequest
+from auth import get_current_user, require_admin
+from constants import UPLOAD_DIR, VALID_STATUSES
+from search import index_delivery, apply_text_search
 
 router = APIRouter(prefix="/deliveries", tags=["Deliveries"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@router.post("/upload")
-def upload_delivery(
+@router.post("", response_model=DeliveryCreateResponse)
+def create_delivery(
+    photo: UploadFile = File(...),
     company: str = Form(...),
-    file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    user: User = Depends(require_courier),
+    user: User = Depends(get_current_user),
 ):
-    company = company.upper()
+    # Validar empresa
+    valid_companies = ["jet", "jadlog", "mercado_livre"]
+    company_lower = company.lower().strip()
+    if company_lower not in valid_companies:
+        raise HTTPException(status_code=400, detail="Empresa inválida")
+    
+    # Verificar se entregador trabalha com essa empresa
+    if user.role == "courier":
+        user_companies = user.companies or []
+        if company_lower not in user_companies:
+            raise HTTPException(status_code=403, detail="Você não trabalha com esta empresa")
 
-    if company not in VALID_COMPANIES:
-        raise HTTPException(400, "Empresa inválida")
+    ext = os.path.splitext(photo.filename)[1].lower()
+    if ext not in [".jpg", ".jpeg", ".png", ".webp"]:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use jpg, png ou webp.")
 
-    if company not in user.get_companies():
-        raise HTTPException(403, "Você não faz entregas dessa empresa")
+    filename = f"{user.id}_{int(datetime.utcnow().timestamp())}{ext}"
+    filepath = os.path.join(UPLOAD_DIR, filename)
 
-    filename = f"{uuid.uuid4()}_{file.filename}"
-    path = os.path.join(UPLOAD_DIR, filename)
+    with open(filepath, "wb") as f:
+        f.write(photo.file.read())
 
-    with open(path, "wb") as f:
-        f.write(file.file.read())
+    photo_url = f"/uploads/{filename}"
 
     delivery = Delivery(
         user_id=user.id,
-        photo_url=path,
-        company=company,
+        created_at=datetime.utcnow(),
+        photo_url=photo_url,
+        company=company_lower,
+        status="pending",
+        notes=None,
     )
-
     db.add(delivery)
+    db.flush()
+    index_delivery(db, delivery)
     db.commit()
+    db.refresh(delivery)
+    return delivery
+
+
+def _filtered_query(
+    db: Session,
+    user: User,
+    from_date: Optional[str],
+    to_date: Optional[str],
+    courier_id: Optional[int],
+    company: Optional[str],
+):
+    q = db.query(Delivery).join(User)
+
+    if user.role != "admin":
+        q = q.filter(Delivery.user_id == user.id)
+    else:
+        if courier_id is not None:
+            q = q.filter(Delivery.user_id == courier_id)
+
+    # Filtro por empresa
+    if company:
+        company_lower = company.lower().strip()
+        valid_companies = ["jet", "jadlog", "mercado_livre"]
+        if company_lower in valid_companies:
+            q = q.filter(Delivery.company == company_lower)
+
+    def parse_date(d: str) -> datetime:
+        return datetime.strptime(d, "%Y-%m-%d")
+
+    if from_date:
+        q = q.filter(Delivery.created_at >= parse_date(from_date))
+    if to_date:
+        q = q.filter(Delivery.created_at < parse_date(to_date) + timedelta(days=1))
+
+    return q
+
+
+@router.get("", response_model=List[DeliveryItem])
+def list_deliveries(
+    from_date: Optional[str] = None,   # "YYYY-MM-DD"
+    to_date: Optional[str] = None,     # "YYYY-MM-DD"
+    courier_id: Optional[int] = None,  # admin pode filtrar por entregador
+    company: Optional[str] = None,     # filtrar por empresa: "jet", "jadlog", "mercado_livre"
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    q = _filtered_query(db, user, from_date, to_date, courier_id, company)
+
+    q = q.order_by(Delivery.created_at.desc())
+    deliveries = q.all()
+
+    for d in deliveries:
+        _ = d.user
 
-    return {"ok": True}
\ No newline at end of file
+    return deliveries
+
+
+# ✅ ADMIN: busca textual (nome/username do entregador, observações) + filtros, paginada
+@router.get("/search", response_model=DeliverySearchResponse)
+def search_deliveries(
+    q: Optional[str] = None,           # ex.: "silva borrada"
+    status: Optional[str] = None,      # "pending", "approved", "rejected"
+    from_date: Optional[str] = None,   # "YYYY-MM-DD"
+    to_date: Optional[str] = None,     # "YYYY-MM-DD"
+    courier_id: Optional[int] = None,
+    company: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    query = _filtered_query(db, admin, from_date, to_date, courier_id, company)
+
+    if status:
+        status_lower = status.lower().strip()
+        if status_lower not in VALID_STATUSES:
+            raise HTTPException(status_code=400, detail="status inválido")
+        query = query.filter(Delivery.status == status_lower)
+
+    if q:
+        query = apply_text_search(query, db, q)
+
+    total = query.count()
+    items = (
+        query.options(joinedload(Delivery.user))
+        .order_by(Delivery.created_at.desc(), Delivery.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    return DeliverySearchResponse(items=items, total=total, page=page, page_size=page_size)
+
+
+@router.patch("/{delivery_id}/status", response_model=DeliveryCreateResponse)
+def set_delivery_status(
+    delivery_id: int,
+    body: ApproveRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    if body.status not in ["approved", "rejected"]:
+        raise HTTPException(status_code=400, detail="status deve ser approved ou rejected")
+
+    delivery = db.query(Delivery).filter(Delivery.id == delivery_id).first()
+    if not delivery:
+        raise HTTPException(status_code=404, detail="Entrega não encontrada")
+
+    delivery.status = body.status
+    delivery.notes = body.notes
+    index_delivery(db, delivery)
+    db.commit()
+    db.refresh(delivery)
+    return delivery
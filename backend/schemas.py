@@ -59,6 +59,13 @@ class DeliveryItem(BaseModel):
         from_attributes = True
 
 
+class DeliverySearchResponse(BaseModel):
+    items: List[DeliveryItem]
+    total: int
+    page: int
+    page_size: int
+
+
 class ApproveRequest(BaseModel):
     status: str  # "approved" ou "rejected"
     notes: Optional[str] = None
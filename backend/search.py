@@ -0,0 +1,88 @@
+import re
+
+from sqlalchemy import text, column, Integer, or_
+from sqlalchemy.orm import Session
+
+from models import User, Delivery
+
+# Índice de busca textual das entregas (nome/username do entregador + observações).
+# No SQLite usa FTS5; em outros bancos cai pra um ILIKE simples.
+FTS_TABLE = "deliveries_fts"
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def init_search_index(engine):
+    """Cria a tabela FTS5 se não existir e popula a partir das entregas atuais"""
+    if not _is_sqlite(engine):
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        if exists:
+            return
+
+        # remove_diacritics: "joao" encontra "João"
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "courier_name, courier_username, notes, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, courier_name, courier_username, notes) "
+            "SELECT d.id, u.name, u.username, COALESCE(d.notes, '') "
+            "FROM deliveries d JOIN users u ON u.id = d.user_id"
+        ))
+
+
+def index_delivery(db: Session, delivery: Delivery):
+    """Atualiza a entrada da entrega no índice (chamar antes do commit)"""
+    if not _is_sqlite(db.get_bind()):
+        return
+
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": delivery.id})
+    db.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, courier_name, courier_username, notes) "
+            "VALUES (:id, :name, :username, :notes)"
+        ),
+        {
+            "id": delivery.id,
+            "name": delivery.user.name,
+            "username": delivery.user.username,
+            "notes": delivery.notes or "",
+        },
+    )
+
+
+def _terms(q: str):
+    return re.findall(r"\w+", q, flags=re.UNICODE)
+
+
+def apply_text_search(query, db: Session, q: str):
+    """Filtra a query de entregas pelos termos de `q` (todos precisam aparecer)"""
+    terms = _terms(q)
+    if not terms:
+        return query
+
+    if _is_sqlite(db.get_bind()):
+        # Cada termo vira uma busca por prefixo entre aspas: "silv"* (sem sintaxe FTS vinda do usuário)
+        match = " ".join(f'"{t}"*' for t in terms)
+        ids = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match").bindparams(
+            match=match
+        ).columns(column("rowid", Integer))
+        return query.filter(Delivery.id.in_(ids))
+
+    for t in terms:
+        pattern = f"%{t}%"
+        query = query.filter(or_(
+            User.name.ilike(pattern),
+            User.username.ilike(pattern),
+            Delivery.notes.ilike(pattern),
+        ))
+    return query